@@ -1,5 +1,6 @@
 
-from pygments import highlight
+import io
+
 from pygments.lexers import PythonLexer
 from pygments.formatters import Terminal256Formatter, TerminalTrueColorFormatter
 from rich.text import Text
@@ -7,17 +8,23 @@ from rich.console import Console
 
 code = "def hello():\n    print('world')"
 lexer = PythonLexer()
+# Lex once; both formatters consume the same token stream
+tokens = list(lexer.get_tokens(code))
 
 print("--- Terminal256Formatter ---")
 formatter256 = Terminal256Formatter(style='monokai')
-ansi256 = highlight(code, lexer, formatter256)
+buf256 = io.StringIO()
+formatter256.format(tokens, buf256)
+ansi256 = buf256.getvalue()
 rich_text256 = Text.from_ansi(ansi256)
 print(f"ANSI len: {len(ansi256)}")
 print(f"First span style: {rich_text256.spans[0] if rich_text256.spans else 'None'}")
 
 print("\n--- TerminalTrueColorFormatter ---")
 formatterTC = TerminalTrueColorFormatter(style='monokai')
-ansiTC = highlight(code, lexer, formatterTC)
+bufTC = io.StringIO()
+formatterTC.format(tokens, bufTC)
+ansiTC = bufTC.getvalue()
 rich_textTC = Text.from_ansi(ansiTC)
 print(f"ANSI len: {len(ansiTC)}")
 print(f"First span style: {rich_textTC.spans[0] if rich_textTC.spans else 'None'}")
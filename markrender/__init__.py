@@ -5,9 +5,26 @@ A production-ready library for rendering streaming LLM markdown responses
 in terminals with beautiful syntax highlighting and formatting.
 """
 
+from typing import TYPE_CHECKING
+
 __version__ = '1.0.0'
 __author__ = 'Praneeth Gandodi'
 
-from .renderer import MarkdownRenderer
-
 __all__ = ['MarkdownRenderer']
+
+if TYPE_CHECKING:
+    from .renderer import MarkdownRenderer
+
+
+def __getattr__(name):
+    # Resolved on first access (PEP 562) so that importing a submodule such
+    # as markrender.themes does not pull in the renderer and Pygments
+    if name == 'MarkdownRenderer':
+        from .renderer import MarkdownRenderer
+        globals()[name] = MarkdownRenderer
+        return MarkdownRenderer
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
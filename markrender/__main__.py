@@ -3,24 +3,22 @@ Command-line entry point for MarkRender
 Reads markdown from stdin or a file and renders it to the terminal
 """
 
+import io
 import sys
 import argparse
 from pathlib import Path
 
-from .renderer import MarkdownRenderer
+from .colors import get_utf8_output
 from .themes import list_themes
 
 
 def preview_themes():
     """Preview all available themes"""
+    from .renderer import MarkdownRenderer
+
     line = '=' * 60
     sep = '-' * 60
 
-    print(line)
-    print("MarkRender Theme Preview")
-    print(line)
-    print()
-
     sample_markdown = """
 ## Sample Heading 2
 This is a sample text with **bold**, *italic*, and `inline code`.
@@ -40,27 +38,57 @@ def hello():
 | A    | B    |
 """
 
-    for theme_name in list_themes():
-        print(f"\n{sep}")
-        print(f"Theme: {theme_name}")
-        print(sep)
+    # Every theme renders into one buffer that is written to stdout once
+    buf = io.StringIO()
+    buf.write(f"{line}\nMarkRender Theme Preview\n{line}\n\n")
+
+    themes = tuple(list_themes())
+    for theme_name in themes:
+        buf.write(f"\n{sep}\nTheme: {theme_name}\n{sep}\n")
 
         renderer = MarkdownRenderer(
             theme=theme_name,
             line_numbers=False,
             code_background=False,
+            output=buf,
             force_color=True
         )
         renderer.render(sample_markdown)
         renderer.finalize()
-        print()
+        buf.write("\n")
+
+    buf.write(f"\n{line}\nTotal themes: {len(themes)}\n{line}\n")
 
-    print("\n" + line)
-    print(f"Total themes: {len(list_themes())}")
-    print(line)
+    output = get_utf8_output(sys.stdout)
+    output.write(buf.getvalue())
+    output.flush()
+
+
+def _decode_input(raw, source):
+    """
+    Decode raw input bytes in one pass, falling back to latin-1
+
+    Args:
+        raw: Bytes read from a file or stdin
+        source: Description of the input used in the fallback warning
+
+    Returns:
+        Decoded text with CRLF and CR line endings normalized to LF
+    """
+    try:
+        content = raw.decode('utf-8')
+    except UnicodeDecodeError:
+        content = raw.decode('latin-1')
+        print(f"Warning: {source} is not UTF-8 encoded. Using latin-1 fallback.", file=sys.stderr)
+    # Match the universal-newlines translation of text-mode reads
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
 
 
 def main():
+    themes = tuple(list_themes())
+
     parser = argparse.ArgumentParser(
         description='MarkRender - Professional Terminal Markdown Renderer',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -82,7 +110,7 @@ def main():
     parser.add_argument(
         '--theme',
         default='github-dark',
-        help=f'Color theme (default: github-dark). Available: {", ".join(list_themes())}'
+        help=f'Color theme (default: github-dark). Available: {", ".join(themes)}'
     )
 
     parser.add_argument(
@@ -138,7 +166,7 @@ def main():
 
     if args.list_themes:
         print("Available themes:")
-        for theme in list_themes():
+        for theme in themes:
             print(f"  {theme}")
         return
 
@@ -146,6 +174,14 @@ def main():
         preview_themes()
         return
 
+    # Validated after the list/preview exits but before any input is read;
+    # parser.error keeps argparse's message format and exit status 2
+    if args.theme not in themes:
+        parser.error(
+            f"argument --theme: invalid choice: {args.theme!r} "
+            f"(choose from {', '.join(themes)})"
+        )
+
     try:
         if args.file:
             file_path = Path(args.file)
@@ -153,14 +189,11 @@ def main():
                 print(f"Error: File '{args.file}' not found", file=sys.stderr)
                 sys.exit(1)
             try:
-                content = file_path.read_text(encoding='utf-8')
-            except UnicodeDecodeError:
-                try:
-                    content = file_path.read_text(encoding='latin-1')
-                    print(f"Warning: File {args.file} is not UTF-8 encoded. Using latin-1 fallback.", file=sys.stderr)
-                except (UnicodeDecodeError, OSError, IOError):
-                    print(f"Error: Could not read file {args.file}. It might be a binary file.", file=sys.stderr)
-                    sys.exit(1)
+                raw = file_path.read_bytes()
+            except OSError as e:
+                print(f"Error: Could not read file {args.file}: {e}", file=sys.stderr)
+                sys.exit(1)
+            content = _decode_input(raw, f"File {args.file}")
         else:
             if sys.stdin.isatty():
                 print("Error: No input file specified and no data piped to stdin.", file=sys.stderr)
@@ -168,21 +201,21 @@ def main():
                 print("   or: cat file.md | markrender", file=sys.stderr)
                 sys.exit(1)
             try:
-                content = sys.stdin.read()
-            except UnicodeDecodeError:
-                try:
-                    if hasattr(sys.stdin, 'reconfigure'):
-                        sys.stdin.reconfigure(encoding='latin-1', errors='replace')
-                        content = sys.stdin.read()
-                    else:
-                        content = sys.stdin.buffer.read().decode('latin-1', errors='replace')
-                except Exception:
-                    print("Error: Could not read from stdin. It might be a binary stream.", file=sys.stderr)
-                    sys.exit(1)
+                if hasattr(sys.stdin, 'buffer'):
+                    content = _decode_input(sys.stdin.buffer.read(), "Input")
+                else:
+                    content = sys.stdin.read()
+            except Exception as e:
+                print(f"Error: Could not read from stdin: {e}", file=sys.stderr)
+                sys.exit(1)
 
         if not content:
             return
 
+        # Imported only on the render path so --help, --version and
+        # --list-themes do not pay for the renderer and its dependencies
+        from .renderer import MarkdownRenderer
+
         renderer = MarkdownRenderer(
             theme=args.theme,
             code_background=args.code_background,
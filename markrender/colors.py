@@ -3,8 +3,12 @@ ANSI color utilities for terminal output
 Python 3.7+ compatible
 """
 
+import os
 import re
+import shutil
+import struct
 import sys
+from functools import lru_cache
 
 
 _force_color = False
@@ -102,6 +106,74 @@ def rgb_bg(r, g, b):
     return f'\033[48;2;{r};{g};{b}m'
 
 
+# Channel values of the 6x6x6 color cube in the xterm 256-color palette
+_CUBE_LEVELS = (0, 95, 135, 175, 215, 255)
+
+
+def _nearest_cube_index(value):
+    return min(range(6), key=lambda i: abs(_CUBE_LEVELS[i] - value))
+
+
+@lru_cache(maxsize=1024)
+def rgb_to_256(r, g, b):
+    """
+    Find the nearest xterm 256-color palette index for an RGB color
+
+    Args:
+        r: Red value (0-255)
+        g: Green value (0-255)
+        b: Blue value (0-255)
+
+    Returns:
+        Palette index (16-255) from the color cube or the grayscale ramp
+    """
+    ri, gi, bi = _nearest_cube_index(r), _nearest_cube_index(g), _nearest_cube_index(b)
+    cube = (_CUBE_LEVELS[ri], _CUBE_LEVELS[gi], _CUBE_LEVELS[bi])
+    cube_dist = (cube[0] - r) ** 2 + (cube[1] - g) ** 2 + (cube[2] - b) ** 2
+
+    gray_i = max(0, min(23, round(((r + g + b) / 3 - 8) / 10)))
+    gray = 8 + 10 * gray_i
+    gray_dist = (gray - r) ** 2 + (gray - g) ** 2 + (gray - b) ** 2
+
+    if gray_dist < cube_dist:
+        return 232 + gray_i
+    return 16 + 36 * ri + 6 * gi + bi
+
+
+_TRUECOLOR_PATTERN = re.compile(r'\033\[([34])8;2;(\d+);(\d+);(\d+)m')
+
+
+def quantize_truecolor(codes):
+    """
+    Rewrite 24-bit color codes as their nearest 256-color equivalents
+
+    Args:
+        codes: ANSI code string possibly containing 24-bit color codes
+
+    Returns:
+        ANSI code string using only 256-color codes
+    """
+    def replace(match):
+        index = rgb_to_256(int(match.group(2)), int(match.group(3)), int(match.group(4)))
+        return f'\033[{match.group(1)}8;5;{index}m'
+    return _TRUECOLOR_PATTERN.sub(replace, codes)
+
+
+def supports_truecolor():
+    """
+    Check whether the terminal advertises 24-bit color support
+
+    Returns:
+        True if COLORTERM is truecolor/24bit or running in Windows Terminal
+    """
+    colorterm = os.environ.get('COLORTERM', '').lower()
+    return colorterm in ('truecolor', '24bit') or 'WT_SESSION' in os.environ
+
+
+_UNPACK_RGB = struct.Struct('BBB').unpack
+
+
+@lru_cache(maxsize=256)
 def hex_to_rgb(hex_color):
     """
     Convert hex color to RGB tuple
@@ -122,11 +194,57 @@ def hex_to_rgb(hex_color):
     if len(hex_color) != 6:
         raise ValueError(f'Invalid hex color: {hex_color!r}')
     try:
-        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-    except ValueError:
+        return _UNPACK_RGB(bytes.fromhex(hex_color))
+    except (ValueError, struct.error):
         raise ValueError(f'Invalid hex color: {hex_color!r}')
 
 
+_SGR_RUN_PATTERN = re.compile(r'(?:\033\[[0-9;]+m)+\Z')
+
+
+@lru_cache(maxsize=256)
+def merge_sgr(codes):
+    """
+    Collapse a run of SGR sequences into a single sequence
+
+    Theme styles are built by concatenation (e.g. ``color + Colors.BOLD``),
+    which costs one escape sequence per attribute. Anything that is not a
+    plain run of SGR sequences is returned unchanged.
+
+    Args:
+        codes: ANSI code string
+
+    Returns:
+        Equivalent ANSI code string with at most one SGR sequence
+    """
+    if codes.count('\033[') < 2 or not _SGR_RUN_PATTERN.match(codes):
+        return codes
+    return '\033[' + codes[2:-1].replace('m\033[', ';') + 'm'
+
+
+def color_codes(color_code, force_color=None, dim_mode=None):
+    """
+    Get the opening and closing codes colorize() would wrap text in
+
+    Lets callers that color many strings the same way (e.g. line numbers)
+    resolve the codes once and format plain strings in their loop.
+
+    Args:
+        color_code: ANSI color code string
+        force_color: Override for the global force_color setting
+        dim_mode: Override for the global dim_mode setting
+
+    Returns:
+        Tuple of (open, close) code strings, both empty without color support
+    """
+    if not supports_color(force_color=force_color):
+        return '', ''
+    _dim = dim_mode if dim_mode is not None else _dim_mode
+    if _dim:
+        color_code = Colors.BRIGHT_BLACK + Colors.DIM
+    return merge_sgr(color_code), Colors.RESET
+
+
 def colorize(text, color_code, force_color=None, dim_mode=None):
     if not supports_color(force_color=force_color):
         return text
@@ -135,6 +253,10 @@ def colorize(text, color_code, force_color=None, dim_mode=None):
         prefix = Colors.BRIGHT_BLACK + Colors.DIM
     else:
         prefix = color_code
+    prefix = merge_sgr(prefix)
+    # Nested formatting already ends in a reset; a second one is a no-op
+    if text.endswith(Colors.RESET):
+        return f'{prefix}{text}'
     return f'{prefix}{text}{Colors.RESET}'
 
 
@@ -142,9 +264,25 @@ def supports_color(force_color=None):
     fc = force_color if force_color is not None else _force_color
     if fc:
         return True
+    return _stdout_supports_color()
+
+
+_IS_WINDOWS = sys.platform == 'win32'
+
+
+@lru_cache(maxsize=1)
+def _stdout_supports_color():
+    """
+    Detect whether sys.stdout accepts ANSI color codes
+
+    Cached after the first call since colorize() asks for every styled span
+    and, on Windows, detection is a ctypes round-trip that also enables VT
+    processing. Call ``_stdout_supports_color.cache_clear()`` after
+    replacing sys.stdout.
+    """
     if not hasattr(sys.stdout, 'isatty') or not sys.stdout.isatty():
         return False
-    if sys.platform == 'win32':
+    if _IS_WINDOWS:
         try:
             import ctypes
             kernel32 = ctypes.windll.kernel32
@@ -170,12 +308,29 @@ def get_terminal_width():
         Terminal width in characters (default 80)
     """
     try:
-        import shutil
         return shutil.get_terminal_size().columns
     except Exception:
         return 80
 
 
+def get_utf8_output(stream):
+    """
+    Ensure an output stream can handle UTF-8 characters
+    
+    Args:
+        stream: Text stream to write rendered output to
+    
+    Returns:
+        The same stream, reconfigured to UTF-8 where supported
+    """
+    if hasattr(stream, 'reconfigure'):
+        try:
+            stream.reconfigure(encoding='utf-8', errors='replace')
+        except Exception:
+            pass
+    return stream
+
+
 _ANSI_PATTERN = re.compile(r'\033\[[0-9;]*[a-zA-Z]|\033\][0-9;]*[a-zA-Z].*?(\033\\|[\a])|[\x80-\x9f]')
 
 
@@ -5,6 +5,7 @@ Supports TOML configuration files
 
 import os
 import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, Optional
 
@@ -29,25 +30,36 @@ DEFAULT_CONFIG = {
     'inline_code_color': None,
 }
 
+# TOML tables whose keys map directly onto DEFAULT_CONFIG entries
+CONFIG_SECTIONS = ('rendering', 'output', 'features')
+
 
 class RendererConfig:
     """
     Configuration for MarkdownRenderer.
     Encapsulates all rendering settings.
+
+    Each setting is bound as a slot attribute at construction, so reads
+    like ``config.theme`` are plain attribute lookups. ``config`` keeps the
+    merged settings as a dict for ``get()``.
     """
+    __slots__ = ('config',) + tuple(DEFAULT_CONFIG)
+
     def __init__(self, **kwargs):
         # Start with defaults
         self.config = DEFAULT_CONFIG.copy()
         
-        # Merge with provided kwargs
-        for key, value in kwargs.items():
-            if key in self.config:
-                self.config[key] = value
-            elif hasattr(self, key):
-                setattr(self, key, value)
-            else:
-                import warnings as _warnings
+        # Merge with provided kwargs; anything outside DEFAULT_CONFIG is ignored
+        unknown = kwargs.keys() - self.config.keys()
+        if unknown:
+            import warnings as _warnings
+            for key in sorted(unknown):
                 _warnings.warn(f"Unknown configuration key: {key!r}")
+            kwargs = {key: value for key, value in kwargs.items() if key not in unknown}
+        self.config.update(kwargs)
+
+        for key, value in self.config.items():
+            setattr(self, key, value)
 
     @classmethod
     def from_file(cls, config_path: Optional[Path] = None):
@@ -58,11 +70,6 @@ class RendererConfig:
     def get(self, key, default=None):
         return self.config.get(key, default)
 
-    def __getattr__(self, name):
-        if name in self.config:
-            return self.config[name]
-        raise AttributeError(f"'RendererConfig' object has no attribute '{name}'")
-
 
 def find_config_file() -> Optional[Path]:
     """
@@ -79,24 +86,33 @@ def find_config_file() -> Optional[Path]:
     # Check current directory
     current_dir = Path.cwd()
     config_file = current_dir / '.markrender.toml'
-    if config_file.exists():
-        return config_file
-    
-    # Check home directory
-    home = Path.home()
-    config_file = home / '.markrender' / 'config.toml'
-    if config_file.exists():
+    if os.path.isfile(config_file):
         return config_file
     
-    # Check XDG config directory
-    xdg_config = os.environ.get('XDG_CONFIG_HOME', home / '.config')
-    config_file = Path(xdg_config) / 'markrender' / 'config.toml'
-    if config_file.exists():
-        return config_file
+    # Check home and XDG config directories
+    for config_file in _home_config_candidates():
+        if os.path.isfile(config_file):
+            return config_file
     
     return None
 
 
+@lru_cache(maxsize=1)
+def _home_config_candidates():
+    """
+    Resolve the home and XDG config file locations once per process
+
+    The working directory may change between calls, so only the
+    home-based candidates are cached.
+    """
+    home = Path.home()
+    xdg_config = os.environ.get('XDG_CONFIG_HOME') or home / '.config'
+    return (
+        home / '.markrender' / 'config.toml',
+        Path(xdg_config) / 'markrender' / 'config.toml',
+    )
+
+
 def load_config(config_path: Optional[Path] = None) -> Dict[str, Any]:
     """
     Load configuration from file.
@@ -110,18 +126,32 @@ def load_config(config_path: Optional[Path] = None) -> Dict[str, Any]:
     if config_path is None:
         config_path = find_config_file()
     
-    config = DEFAULT_CONFIG.copy()
-    
     if config_path is None or tomllib is None:
-        return config
+        return DEFAULT_CONFIG.copy()
+    
+    try:
+        stat = os.stat(config_path)
+    except OSError as e:
+        print(f"Warning: Could not read config file {config_path}: {e}", file=sys.stderr)
+        return DEFAULT_CONFIG.copy()
+    
+    # Keyed on mtime and size so an edited file is parsed again
+    cached = _load_config_file(os.fspath(config_path), stat.st_mtime_ns, stat.st_size)
+    return cached.copy()
+
+
+@lru_cache(maxsize=4)
+def _load_config_file(config_path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Parse a config file and merge it over the defaults (cached; callers copy)"""
+    config = DEFAULT_CONFIG.copy()
     
     try:
         with open(config_path, 'rb') as f:
             file_config = tomllib.load(f)
         
-        # Merge with defaults
-        if 'rendering' in file_config:
-            for key, value in file_config['rendering'].items():
+        # Merge every known key from the settings sections over the defaults
+        for section in CONFIG_SECTIONS:
+            for key, value in file_config.get(section, {}).items():
                 if key in config:
                     config[key] = value
         
@@ -133,20 +163,6 @@ def load_config(config_path: Optional[Path] = None) -> Dict[str, Any]:
             else:
                 config['theme'] = theme_val
         
-        # Handle output configuration
-        if 'output' in file_config:
-            output_config = file_config['output']
-            if 'width' in output_config:
-                config['width'] = output_config['width']
-            if 'force_color' in output_config:
-                config['force_color'] = output_config['force_color']
-        
-        # Handle features configuration
-        if 'features' in file_config:
-            features_config = file_config['features']
-            if 'stream_code' in features_config:
-                config['stream_code'] = features_config['stream_code']
-        
     except (IOError, OSError) as e:
         print(f"Warning: Could not read config file {config_path}: {e}", file=sys.stderr)
     except Exception as e:
@@ -4,15 +4,98 @@ Handles rendering of headings, code, tables, lists, and more
 """
 
 import re
-from pygments import highlight
-from pygments.lexers import get_lexer_by_name, TextLexer
-from pygments.formatters import Terminal256Formatter
-try:
-    import emoji as emoji_lib
-except ImportError:
-    emoji_lib = None
+from functools import lru_cache
 
-from .colors import colorize, Colors, get_terminal_width
+from .colors import colorize, color_codes, merge_sgr, supports_color, Colors, get_terminal_width
+
+
+_SGR_PATTERN = re.compile(r'\033\[[0-9;]*m')
+
+# Indent strings for nested list items, by nesting level
+_INDENTS = tuple('  ' * level for level in range(32))
+
+
+@lru_cache(maxsize=1)
+def _get_emoji_lib():
+    """
+    Import the emoji package on first use, or None if it is not installed
+
+    Its import builds the full emoji database, which documents without
+    ``:shortcode:`` markup never need.
+    """
+    try:
+        import emoji
+    except ImportError:
+        return None
+    return emoji
+
+
+@lru_cache(maxsize=512)
+def _emojize(emoji_code):
+    """
+    Resolve an emoji shortcode, memoized since documents repeat a few codes
+
+    Returns the ``:shortcode:`` text unchanged if it is unknown or the
+    emoji package is unavailable.
+    """
+    emoji_lib = _get_emoji_lib()
+    if emoji_lib:
+        try:
+            return emoji_lib.emojize(f':{emoji_code}:', language='alias')
+        except Exception:
+            pass
+    return f':{emoji_code}:'
+
+
+@lru_cache(maxsize=128)
+def _get_lexer(language):
+    """
+    Look up the Pygments lexer for language, or None if there is none
+
+    Resolved once per language per process: streamed code blocks ask on
+    every line, and documents alternate between a few languages. Misses
+    are cached too, since an unknown name costs a full plugin scan.
+    """
+    from pygments.lexers import get_lexer_by_name
+
+    try:
+        return get_lexer_by_name(language, stripall=False)
+    except Exception:
+        return None
+
+
+@lru_cache(maxsize=16)
+def _get_formatter(style):
+    """
+    Build the Terminal256Formatter for a Pygments style once per process
+
+    Construction resolves the style and precomputes its color table; the
+    formatter holds no per-call state, so one instance is shared.
+    """
+    from pygments.formatters import Terminal256Formatter
+
+    try:
+        return Terminal256Formatter(style=style)
+    except Exception:
+        return Terminal256Formatter(style='monokai')
+
+
+@lru_cache(maxsize=512)
+def _cached_highlight(code, language, style):
+    """
+    Highlight code with Pygments, memoized on (code, language, style)
+
+    Identical code blocks and repeated streamed lines (blank lines, closing
+    braces, ``return`` etc.) skip the lex + format pass after the first hit.
+    Raises if no lexer exists for language; callers choose the fallback.
+    Pygments is imported here so documents without code never load it.
+    """
+    from pygments import highlight
+
+    lexer = _get_lexer(language)
+    if lexer is None:
+        raise ValueError(f'No lexer for language {language!r}')
+    return highlight(code, lexer, _get_formatter(style))
 
 
 class MarkdownFormatter:
@@ -35,11 +118,58 @@ class MarkdownFormatter:
         self.width = width or get_terminal_width()
         self.force_color = force_color
         self.dim_mode = False
+        # Resolved once; without color support every _colorize is a no-op
+        self._color_enabled = supports_color(force_color=force_color)
+
+        # Marker and style per heading level, fixed for the formatter's theme;
+        # H1 and H2 are bold, deeper levels use the plain theme color
+        self._heading_formats = {}
+        for level in range(1, 7):
+            color = self.theme['heading_colors'].get(level, Colors.WHITE)
+            style = color + Colors.BOLD if level <= 2 else color
+            self._heading_formats[level] = ('#' * level + ' ', merge_sgr(style))
+
+        # Link and image text styles, fixed for the formatter's theme
+        self._link_style = merge_sgr(self.theme['link'] + Colors.UNDERLINE)
+        self._image_style = merge_sgr(self.theme.get('link', Colors.BRIGHT_CYAN) + Colors.ITALIC)
+
+        # (label style, border color) per alert type; unknown types use gray
+        self._alert_styles = {
+            alert_type: (merge_sgr(color + Colors.BOLD), color)
+            for alert_type, color in self.theme.get('alert_colors', {}).items()
+        }
+        self._default_alert_style = (merge_sgr(Colors.BRIGHT_BLACK + Colors.BOLD), Colors.BRIGHT_BLACK)
+
+        header_color = self.theme.get('table_header')
+        self._table_header_style = merge_sgr(header_color + Colors.BOLD) if header_color else None
+
+        # Rendered horizontal rules keyed on (width, dim_mode)
+        self._hr_cache = {}
+        # Colored quote/alert line prefixes keyed on (border color, dim_mode)
+        self._border_prefix_cache = {}
 
     def _colorize(self, text, color_code):
         """Wrap colorize with instance-level force_color and dim_mode settings"""
-        return colorize(text, color_code, force_color=self.force_color, dim_mode=self.dim_mode)
+        if not self._color_enabled:
+            return text
+        # Color support is already settled, so force it rather than re-check
+        return colorize(text, color_code, True, self.dim_mode)
+
+    def _color_codes(self, color_code):
+        """Opening/closing codes matching _colorize, for coloring in a loop"""
+        if not self._color_enabled:
+            return '', ''
+        return color_codes(color_code, True, self.dim_mode)
     
+    def _border_prefix(self, color):
+        """Newline plus colored '│ ' border that starts each quote/alert line"""
+        key = (color, self.dim_mode)
+        prefix = self._border_prefix_cache.get(key)
+        if prefix is None:
+            prefix = f"\n{self._colorize('│', color)} "
+            self._border_prefix_cache[key] = prefix
+        return prefix
+
     def format_heading(self, level, text):
         """
         Format heading (H1-H6) with left justification and color
@@ -51,22 +181,9 @@ class MarkdownFormatter:
         Returns:
             Formatted heading string
         """
-        level = max(1, min(6, level))  # Clamp to 1-6
-        color = self.theme['heading_colors'].get(level, Colors.WHITE)
-        
-        # Different symbols for different heading levels
-        if level == 1:
-            marker = '# '
-            text = self._colorize(f'{marker}{text}', color + Colors.BOLD)
-            return f'\n{text}\n'
-        elif level == 2:
-            marker = '## '
-            text = self._colorize(f'{marker}{text}', color + Colors.BOLD)
-            return f'\n{text}\n'
-        else:
-            marker = '#' * level + ' '
-            text = self._colorize(f'{marker}{text}', color)
-            return f'\n{text}\n'
+        # Clamp to 1-6
+        marker, style = self._heading_formats[1 if level < 1 else 6 if level > 6 else level]
+        return f"\n{self._colorize(f'{marker}{text}', style)}\n"
     
     def format_code_block(self, code, language='', line_numbers=True):
         """
@@ -80,20 +197,17 @@ class MarkdownFormatter:
         Returns:
             Formatted code block string
         """
-        try:
-            if language:
-                lexer = get_lexer_by_name(language, stripall=False)
-            else:
-                lexer = TextLexer()
-        except Exception:
-            lexer = TextLexer()
-        
-        # Format code with pygments
-        try:
-            formatter = Terminal256Formatter(style=self.theme.get('pygments_style', 'monokai'))
-        except Exception:
-            formatter = Terminal256Formatter(style='monokai')
-        highlighted = highlight(code, lexer, formatter).rstrip()
+        # Without a known language there is nothing to highlight; plain
+        # text skips Pygments instead of running it through TextLexer. Blank
+        # edge lines are dropped as Pygments' stripnl would
+        highlighted = code.strip('\n')
+        if language:
+            style = self.theme.get('pygments_style', 'monokai')
+            try:
+                highlighted = _cached_highlight(code, language, style)
+            except Exception:
+                pass
+        highlighted = highlighted.rstrip()
         
         # Add line numbers if requested
         if line_numbers:
@@ -101,22 +215,29 @@ class MarkdownFormatter:
             max_line_num = len(lines)
             num_width = len(str(max_line_num))
             
-            formatted_lines = []
-            for i, line in enumerate(lines, 1):
-                line_num = self._colorize(f'{i:>{num_width}}', Colors.BRIGHT_BLACK)
-                # Add background if requested
-                if self.code_background:
-                    formatted_lines.append(f'{Colors.BG_BRIGHT_BLACK} {line_num} {Colors.RESET} {line}')
-                else:
-                    formatted_lines.append(f' {line_num}  {line}')
+            num_open, num_close = self._color_codes(Colors.BRIGHT_BLACK)
+            # Add background if requested
+            if self.code_background:
+                num_open = f'{Colors.BG_BRIGHT_BLACK} {num_open}'
+                num_close = f'{num_close} {Colors.RESET} '
+            else:
+                num_open = f' {num_open}'
+                num_close = f'{num_close}  '
             
-            result = '\n'.join(formatted_lines)
+            result = '\n'.join([
+                f'{num_open}{i:>{num_width}}{num_close}{line}'
+                for i, line in enumerate(lines, 1)
+            ])
         else:
             result = highlighted
         
         # Add spacing
         return f'\n{result}\n'
     
+    def format_line_number(self, number, width):
+        """Format a right-aligned code line number for streamed code lines"""
+        return self._colorize(f'{number:>{width}}', Colors.BRIGHT_BLACK)
+
     def format_inline_code(self, text):
         """
         Format inline code with custom color
@@ -135,15 +256,12 @@ class MarkdownFormatter:
 
         max_cols = max(len(row) for row in rows)
 
-        normalized_rows = []
-        for row in rows:
-            normalized_row = list(row) + [''] * (max_cols - len(row))
-            normalized_rows.append(normalized_row)
+        normalized_rows = [list(row) + [''] * (max_cols - len(row)) for row in rows]
+        clean_rows = [[_SGR_PATTERN.sub('', str(cell)) for cell in row] for row in normalized_rows]
 
         col_widths = [0] * max_cols
-        for row in normalized_rows:
-            for i, cell in enumerate(row):
-                clean_cell = re.sub(r'\033\[[0-9;]*m', '', str(cell))
+        for clean_row in clean_rows:
+            for i, clean_cell in enumerate(clean_row):
                 col_widths[i] = max(col_widths[i], len(clean_cell))
 
         total_border_chars = max_cols * 3 + 1
@@ -160,40 +278,29 @@ class MarkdownFormatter:
                     col_widths[i] = max(1, col_widths[i] * available // widths_sum)
 
         border_color = self.theme['table_border']
-        header_color = self.theme.get('table_header')
+        header_style = self._table_header_style
+        bar = self._colorize('│', border_color)
+        border_parts = ['─' * (w + 2) for w in col_widths]
         formatted = []
 
-        for row_idx, row in enumerate(normalized_rows):
-            padded = []
-            for i, cell in enumerate(row):
-                clean_cell = re.sub(r'\033\[[0-9;]*m', '', str(cell))
-                if len(clean_cell) > col_widths[i]:
-                    cell_str = clean_cell[:col_widths[i] - 1] + '…'
-                    if row_idx == 0 and header_color:
-                        cell_str = self._colorize(cell_str, header_color + Colors.BOLD)
+        for row_idx, (row, clean_row) in enumerate(zip(normalized_rows, clean_rows)):
+            cells_formatted = []
+            for cell, clean_cell, width in zip(row, clean_row, col_widths):
+                if len(clean_cell) > width:
+                    cell_str = clean_cell[:width - 1] + '…'
                 else:
-                    cell_str = str(cell)
-                    padding = col_widths[i] - len(clean_cell)
-                    if padding:
-                        cell_str = cell_str + ' ' * padding
-                    if row_idx == 0 and header_color:
-                        cell_str = self._colorize(cell_str, header_color + Colors.BOLD)
-                padded.append(cell_str)
-
-            cells_formatted = [f' {cell} ' for cell in padded]
-            row_str = self._colorize('│', border_color) + self._colorize('│', border_color).join(cells_formatted) + self._colorize('│', border_color)
-            formatted.append(row_str)
+                    cell_str = str(cell) + ' ' * (width - len(clean_cell))
+                if row_idx == 0 and header_style:
+                    cell_str = self._colorize(cell_str, header_style)
+                cells_formatted.append(f' {cell_str} ')
+
+            formatted.append(bar + bar.join(cells_formatted) + bar)
 
             if row_idx == 0:
-                sep_parts = []
-                for w in col_widths:
-                    sep_parts.append('─' * (w + 2))
-                sep = self._colorize('├' + '┼'.join(sep_parts) + '┤', border_color)
-                formatted.append(sep)
+                formatted.append(self._colorize('├' + '┼'.join(border_parts) + '┤', border_color))
 
-        top_parts = ['─' * (w + 2) for w in col_widths]
-        top = self._colorize('┌' + '┬'.join(top_parts) + '┐', border_color)
-        bottom = self._colorize('└' + '┴'.join(top_parts) + '┘', border_color)
+        top = self._colorize('┌' + '┬'.join(border_parts) + '┐', border_color)
+        bottom = self._colorize('└' + '┴'.join(border_parts) + '┘', border_color)
 
         return '\n' + top + '\n' + '\n'.join(formatted) + '\n' + bottom + '\n'
     
@@ -210,7 +317,7 @@ class MarkdownFormatter:
         Returns:
             Formatted list item string
         """
-        indent = '  ' * indent_level
+        indent = _INDENTS[indent_level] if 0 <= indent_level < 32 else '  ' * indent_level
         if ordered:
             marker = self._colorize(f'{number}.', Colors.BRIGHT_BLUE)
         else:
@@ -237,21 +344,16 @@ class MarkdownFormatter:
         return f'{box}  {text}'
     
     def format_blockquote(self, text):
-        border = self._colorize('│', self.theme['blockquote_border'])
-        lines = text.split('\n')
-        formatted = [f'{border} {line}' for line in lines]
-        return '\n' + '\n'.join(formatted) + '\n'
+        prefix = self._border_prefix(self.theme['blockquote_border'])
+        return prefix + text.replace('\n', prefix) + '\n'
 
     def format_alert(self, alert_type, text):
-        alert_colors = self.theme.get('alert_colors', {})
-        color = alert_colors.get(alert_type, Colors.BRIGHT_BLACK)
-        label = self._colorize(f' {alert_type} ', color + Colors.BOLD)
+        label_style, color = self._alert_styles.get(alert_type, self._default_alert_style)
+        label = self._colorize(f' {alert_type} ', label_style)
         if not text:
             return '\n' + label + '\n'
-        border = self._colorize('│', color)
-        lines = text.split('\n')
-        formatted = [f'{border} {line}' for line in lines]
-        return '\n' + label + '\n' + '\n'.join(formatted) + '\n'
+        prefix = self._border_prefix(color)
+        return '\n' + label + prefix + text.replace('\n', prefix) + '\n'
 
     def format_link(self, text, url):
         """
@@ -264,13 +366,15 @@ class MarkdownFormatter:
         Returns:
             Formatted link string
         """
-        link_color = self.theme['link']
-        colored_text = self._colorize(text, link_color + Colors.UNDERLINE)
-        return f'{colored_text} ({self._colorize(url, Colors.DIM)})'
+        return f'{self._colorize(text, self._link_style)} ({self._colorize(url, Colors.DIM)})'
     
     def format_hr(self):
-        line = '─' * self.width
-        return '\n' + self._colorize(line, self.theme['hr']) + '\n'
+        key = (self.width, self.dim_mode)
+        hr = self._hr_cache.get(key)
+        if hr is None:
+            hr = '\n' + self._colorize('─' * self.width, self.theme['hr']) + '\n'
+            self._hr_cache[key] = hr
+        return hr
     
     def format_image(self, alt_text, url):
         """
@@ -283,22 +387,15 @@ class MarkdownFormatter:
         Returns:
             Formatted image string
         """
-        img_color = self.theme.get('link', Colors.BRIGHT_CYAN)
-        colored_alt = self._colorize(f'[{alt_text}]', img_color + Colors.ITALIC)
-        return f'{colored_alt}({self._colorize(url, Colors.DIM)})'
+        return f"{self._colorize(f'[{alt_text}]', self._image_style)}({self._colorize(url, Colors.DIM)})"
 
     def format_code_line(self, line, language):
         """Format a single code line for streaming with per-line syntax highlighting"""
+        if not language:
+            return line
         try:
-            if language:
-                lexer = get_lexer_by_name(language, stripall=False)
-            else:
-                lexer = TextLexer()
-            try:
-                formatter = Terminal256Formatter(style=self.theme.get('pygments_style', 'monokai'))
-            except Exception:
-                formatter = Terminal256Formatter(style='monokai')
-            highlighted = highlight(line, lexer, formatter).rstrip('\n')
+            style = self.theme.get('pygments_style', 'monokai')
+            highlighted = _cached_highlight(line, language, style).rstrip('\n')
         except Exception:
             highlighted = line
         return highlighted
@@ -313,12 +410,7 @@ class MarkdownFormatter:
         Returns:
             Emoji character or original code if not found
         """
-        if emoji_lib:
-            try:
-                return emoji_lib.emojize(f':{emoji_code}:', language='alias')
-            except Exception:
-                pass
-        return f':{emoji_code}:'
+        return _emojize(emoji_code)
     
     def format_bold(self, text):
         """Format bold text"""
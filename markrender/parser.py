@@ -27,6 +27,22 @@ class MarkdownParser:
     ALERT_PATTERN = re.compile(r'^ {0,3}>\s*\[!(NOTE|TIP|IMPORTANT|WARNING|CAUTION)\]\s*$', re.MULTILINE)
     HR_PATTERN = re.compile(r'^(\*\*\*+|---+|___+)\s*$', re.MULTILINE)
     TABLE_ROW_PATTERN = re.compile(r'^\|(.+)\|$', re.MULTILINE)
+    SEPARATOR_CELL_PATTERN = re.compile(r'^:?-+:?$')
+
+    # Block constructs that can open with a given first non-blank character.
+    # Any other first character means the line can only be paragraph text,
+    # so the block patterns above need not be tried at all.
+    BLOCK_DISPATCH = {
+        '`': frozenset(['code_fence']),
+        '|': frozenset(['table_row']),
+        '>': frozenset(['blockquote']),
+        '#': frozenset(['heading']),
+        '-': frozenset(['hr', 'checkbox', 'list_item']),
+        '*': frozenset(['hr', 'list_item']),
+        '_': frozenset(['hr']),
+    }
+    ORDERED_LIST_START = frozenset(['ordered_list'])
+    NO_BLOCK = frozenset()
 
     def __init__(self):
         self.in_code_block = False
@@ -34,6 +50,18 @@ class MarkdownParser:
         self.code_buffer = []
         self.in_table = False
         self.table_buffer = []
+        self._rules = ()
+        self._rules_formatter = None
+
+    def block_candidates(self, line):
+        """Return the block kinds that could match line, keyed on its first non-blank char"""
+        content = line.lstrip()
+        if not content:
+            return self.NO_BLOCK
+        first = content[0]
+        if first.isdigit():
+            return self.ORDERED_LIST_START
+        return self.BLOCK_DISPATCH.get(first, self.NO_BLOCK)
 
     def parse_heading(self, line):
         match = self.HEADING_PATTERN.match(line)
@@ -58,7 +86,7 @@ class MarkdownParser:
 
     @staticmethod
     def is_separator_row(cells):
-        return bool(cells and all(re.match(r'^:?-+:?$', cell) for cell in cells))
+        return bool(cells and all(MarkdownParser.SEPARATOR_CELL_PATTERN.match(cell) for cell in cells))
 
     def parse_checkbox(self, line):
         match = self.CHECKBOX_PATTERN.match(line)
@@ -101,38 +129,33 @@ class MarkdownParser:
     def is_hr(self, line):
         return bool(self.HR_PATTERN.match(line))
 
+    def _inline_rules(self, formatter):
+        """
+        Return (trigger, pattern, replacement) triples bound to formatter
+
+        The formatter acts as the output sink: each match is handed straight
+        to its format_* method. The bound callbacks are built once per
+        formatter instead of as fresh closures on every call. ``trigger`` is
+        a literal every match must contain, so a substring test can skip the
+        regex pass entirely for text without that construct.
+        """
+        if self._rules_formatter is not formatter:
+            self._rules = (
+                ('`', self.INLINE_CODE_PATTERN, lambda m: formatter.format_inline_code(m.group(2))),
+                ('***', self.BOLD_ITALIC_PATTERN, lambda m: formatter.format_bold(formatter.format_italic(m.group(1)))),
+                ('**', self.BOLD_PATTERN, lambda m: formatter.format_bold(m.group(1))),
+                ('*', self.ITALIC_PATTERN, lambda m: formatter.format_italic(m.group(1))),
+                ('~~', self.STRIKETHROUGH_PATTERN, lambda m: formatter.format_strikethrough(m.group(1))),
+                ('](', self.IMAGE_PATTERN, lambda m: formatter.format_image(m.group(1), m.group(2))),
+                ('](', self.LINK_PATTERN, lambda m: formatter.format_link(m.group(1), m.group(2))),
+                (':', self.EMOJI_PATTERN, lambda m: formatter.format_emoji(m.group(1))),
+            )
+            self._rules_formatter = formatter
+        return self._rules
+
     def apply_inline_formatting(self, text, formatter):
         text = strip_ansi(text)
-        def replace_inline_code(match):
-            return formatter.format_inline_code(match.group(2))
-        text = self.INLINE_CODE_PATTERN.sub(replace_inline_code, text)
-
-        def replace_bold_italic(match):
-            return formatter.format_bold(formatter.format_italic(match.group(1)))
-        text = self.BOLD_ITALIC_PATTERN.sub(replace_bold_italic, text)
-
-        def replace_bold(match):
-            return formatter.format_bold(match.group(1))
-        text = self.BOLD_PATTERN.sub(replace_bold, text)
-
-        def replace_italic(match):
-            return formatter.format_italic(match.group(1))
-        text = self.ITALIC_PATTERN.sub(replace_italic, text)
-
-        def replace_strikethrough(match):
-            return formatter.format_strikethrough(match.group(1))
-        text = self.STRIKETHROUGH_PATTERN.sub(replace_strikethrough, text)
-
-        def replace_image(match):
-            return formatter.format_image(match.group(1), match.group(2))
-        text = self.IMAGE_PATTERN.sub(replace_image, text)
-
-        def replace_link(match):
-            return formatter.format_link(match.group(1), match.group(2))
-        text = self.LINK_PATTERN.sub(replace_link, text)
-
-        def replace_emoji(match):
-            return formatter.format_emoji(match.group(1))
-        text = self.EMOJI_PATTERN.sub(replace_emoji, text)
-
+        for trigger, pattern, replace in self._inline_rules(formatter):
+            if trigger in text:
+                text = pattern.sub(replace, text)
         return text
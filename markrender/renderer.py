@@ -6,8 +6,8 @@ import sys
 from typing import Optional
 from .parser import MarkdownParser
 from .formatters import MarkdownFormatter
-from .themes import get_theme
-from .colors import get_terminal_width, colorize, Colors, strip_ansi
+from .themes import get_theme, quantize_theme
+from .colors import get_terminal_width, get_utf8_output, strip_ansi, supports_truecolor, quantize_truecolor
 
 
 class RenderState:
@@ -62,6 +62,9 @@ class MarkdownRenderer:
         renderer.finalize()
     """
 
+    # Upper bound on memoized inline-formatted strings kept per renderer
+    INLINE_CACHE_SIZE = 1024
+
     def __init__(
         self,
         theme='github-dark',
@@ -72,14 +75,22 @@ class MarkdownRenderer:
         output=None,
         stream_code=True,
         force_color=False,
+        truecolor=None,
     ):
         self.theme_config = get_theme(theme)
+        self.truecolor = supports_truecolor() if truecolor is None else truecolor
+        if not self.truecolor:
+            # 256-color codes are about half the bytes and render correctly
+            # on terminals that do not understand 24-bit SGR sequences
+            quantize_theme(self.theme_config)
+            if inline_code_color:
+                inline_code_color = quantize_truecolor(inline_code_color)
         self.code_background = code_background
         self.line_numbers = line_numbers
         self.stream_code = stream_code
         self.width = width or get_terminal_width()
         self.force_color = force_color
-        self.output = output or self._get_utf8_output(sys.stdout)
+        self.output = output or get_utf8_output(sys.stdout)
 
         self.parser = MarkdownParser()
         self.formatter = MarkdownFormatter(
@@ -94,6 +105,9 @@ class MarkdownRenderer:
         self.state = RenderState()
         self._last_element = None
         self._last_output_ended_with_newline = False
+        self._dim_mode = False
+        self._inline_cache = {}
+        self._needs_flush = False
 
     def render(self, chunk, dim_mode=False):
         """
@@ -111,19 +125,13 @@ class MarkdownRenderer:
 
         chunk = strip_ansi(chunk)
         self.buffer += chunk
+        self._process_remaining_buffer()
 
-        if self.state.in_code_block:
-            self._handle_code_block_buffer()
-            return
-
-        if self.state.in_table:
-            self._handle_table_buffer()
-            if self.state.in_table:
-                return
-
-        while '\n' in self.buffer:
-            line, self.buffer = self.buffer.split('\n', 1)
-            self._process_line(line + '\n')
+        # One flush per chunk keeps streaming output live without a flush
+        # per written element when a chunk holds many lines
+        if self._needs_flush:
+            self.output.flush()
+            self._needs_flush = False
 
     def _handle_code_block_buffer(self):
         if '\n' not in self.buffer:
@@ -185,8 +193,17 @@ class MarkdownRenderer:
             self._handle_table_buffer()
             if self.state.in_table:
                 return
-        while '\n' in self.buffer:
-            line, self.buffer = self.buffer.split('\n', 1)
+        self._process_buffered_lines()
+
+    def _process_buffered_lines(self):
+        """Process every complete line in the buffer, keeping the partial tail"""
+        if '\n' not in self.buffer:
+            return
+        # Split once rather than peeling one line at a time, which re-copies
+        # the rest of the buffer per line when a whole document arrives at once
+        lines = self.buffer.split('\n')
+        self.buffer = lines.pop()
+        for line in lines:
             self._process_line(line + '\n')
 
     def _handle_table_buffer(self):
@@ -204,7 +221,7 @@ class MarkdownRenderer:
             table_row = self.parser.parse_table_row(stripped)
             if table_row is not None:
                 if not self.parser.is_separator_row(table_row):
-                    formatted_row = [self.parser.apply_inline_formatting(cell, self.formatter) for cell in table_row]
+                    formatted_row = [self._format_inline(cell) for cell in table_row]
                     self.state.table_rows.append(formatted_row)
             else:
                 if self.state.table_rows:
@@ -222,8 +239,11 @@ class MarkdownRenderer:
     def _process_line(self, line):
         """Process a single line of markdown"""
         stripped = line.rstrip()
+        candidates = self.parser.block_candidates(stripped)
 
-        lang = self.parser.parse_code_block_delimiter(stripped)
+        lang = None
+        if 'code_fence' in candidates:
+            lang = self.parser.parse_code_block_delimiter(stripped)
         if lang is not None:
             if not self.state.in_code_block:
                 self.state.in_code_block = True
@@ -250,13 +270,15 @@ class MarkdownRenderer:
                 self._write_code_line(content)
             return
 
-        table_row = self.parser.parse_table_row(stripped)
+        table_row = None
+        if 'table_row' in candidates:
+            table_row = self.parser.parse_table_row(stripped)
         if table_row is not None:
             if not self.state.in_table:
                 self.state.in_table = True
                 self.state.table_rows = []
             if not self.parser.is_separator_row(table_row):
-                formatted_row = [self.parser.apply_inline_formatting(cell, self.formatter) for cell in table_row]
+                formatted_row = [self._format_inline(cell) for cell in table_row]
                 self.state.table_rows.append(formatted_row)
             return
         elif self.state.in_table:
@@ -264,7 +286,9 @@ class MarkdownRenderer:
             self._write(formatted, 'table')
             self.state.reset_table()
 
-        blockquote_text = self.parser.parse_blockquote(stripped)
+        blockquote_text = None
+        if 'blockquote' in candidates:
+            blockquote_text = self.parser.parse_blockquote(stripped)
         if blockquote_text is not None:
             if not self.state.in_blockquote:
                 self.state.in_blockquote = True
@@ -287,44 +311,52 @@ class MarkdownRenderer:
             self.state.reset_blockquote()
             return
 
-        if self.parser.is_hr(stripped):
+        if 'hr' in candidates and self.parser.is_hr(stripped):
             self._write(self.formatter.format_hr(), 'hr')
             return
 
-        heading = self.parser.parse_heading(stripped)
+        if not candidates:
+            self._write_text_line(line, stripped)
+            return
+
+        heading = 'heading' in candidates and self.parser.parse_heading(stripped)
         if heading:
             level, text = heading
-            text = self.parser.apply_inline_formatting(text, self.formatter)
+            text = self._format_inline(text)
             formatted = self.formatter.format_heading(level, text)
             self._write(formatted, 'heading')
             return
 
-        checkbox = self.parser.parse_checkbox(stripped)
+        checkbox = 'checkbox' in candidates and self.parser.parse_checkbox(stripped)
         if checkbox:
             checked, text = checkbox
-            text = self.parser.apply_inline_formatting(text, self.formatter)
+            text = self._format_inline(text)
             formatted = self.formatter.format_checkbox(checked, text)
             self._write(formatted + '\n', 'checkbox')
             return
 
-        ordered_item = self.parser.parse_ordered_list_item(stripped)
+        ordered_item = 'ordered_list' in candidates and self.parser.parse_ordered_list_item(stripped)
         if ordered_item:
             indent, number, text = ordered_item
-            text = self.parser.apply_inline_formatting(text, self.formatter)
+            text = self._format_inline(text)
             formatted = self.formatter.format_list_item(text, ordered=True, number=number, indent_level=indent)
             self._write(formatted + '\n', 'ordered_list')
             return
 
-        list_item = self.parser.parse_list_item(stripped)
+        list_item = 'list_item' in candidates and self.parser.parse_list_item(stripped)
         if list_item:
             indent, text = list_item
-            text = self.parser.apply_inline_formatting(text, self.formatter)
+            text = self._format_inline(text)
             formatted = self.formatter.format_list_item(text, ordered=False, indent_level=indent)
             self._write(formatted + '\n', 'list_item')
             return
 
+        self._write_text_line(line, stripped)
+
+    def _write_text_line(self, line, stripped):
+        """Write a plain paragraph line with inline formatting"""
         if stripped:
-            formatted = self.parser.apply_inline_formatting(line, self.formatter)
+            formatted = self._format_inline(line)
             self._write(formatted, 'inline')
         else:
             self._write(line, 'inline')
@@ -367,16 +399,7 @@ class MarkdownRenderer:
             self.state.reset_blockquote()
 
         self.output.flush()
-
-    @staticmethod
-    def _get_utf8_output(stream):
-        """Ensure output stream can handle UTF-8 characters"""
-        if hasattr(stream, 'reconfigure'):
-            try:
-                stream.reconfigure(encoding='utf-8', errors='replace')
-            except Exception:
-                pass
-        return stream
+        self._needs_flush = False
 
     def _ensure_spacing(self, element_type):
         """Ensure proper spacing before writing a block-level element"""
@@ -399,9 +422,20 @@ class MarkdownRenderer:
             self.output.write(text)
         except UnicodeEncodeError:
             self.output.write(text.encode('utf-8', errors='replace').decode('utf-8'))
-        self.output.flush()
+        self._needs_flush = True
         self._last_output_ended_with_newline = text.endswith('\n')
 
+    def _format_inline(self, text):
+        """Apply inline formatting, memoized per renderer on (text, dim_mode)"""
+        key = (text, self._dim_mode)
+        formatted = self._inline_cache.get(key)
+        if formatted is None:
+            if len(self._inline_cache) >= self.INLINE_CACHE_SIZE:
+                self._inline_cache.clear()
+            formatted = self.parser.apply_inline_formatting(text, self.formatter)
+            self._inline_cache[key] = formatted
+        return formatted
+
     def _write_code_line(self, line):
         highlighted = self.formatter.format_code_line(line, self.state.code_language)
         if self.line_numbers:
@@ -409,7 +443,7 @@ class MarkdownRenderer:
             w = len(str(num))
             if w > self.state.code_line_num_width:
                 self.state.code_line_num_width = w
-            formatted = colorize(f'{num:>{self.state.code_line_num_width}}', Colors.BRIGHT_BLACK, force_color=self.force_color, dim_mode=self._dim_mode)
+            formatted = self.formatter.format_line_number(num, self.state.code_line_num_width)
             self._write(f' {formatted}  {highlighted}\n', 'code_block')
         else:
             self._write(f'  {highlighted}\n', 'code_block')
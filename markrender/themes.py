@@ -3,7 +3,7 @@ Theme definitions for syntax highlighting and markdown elements
 """
 
 import copy
-from .colors import rgb, Colors
+from .colors import rgb, Colors, quantize_truecolor
 
 
 # Syntax highlighting themes for code blocks
@@ -227,3 +227,21 @@ def list_themes():
         List of theme names
     """
     return list(SYNTAX_THEMES.keys())
+
+
+def quantize_theme(theme):
+    """
+    Convert a theme's 24-bit colors to the 256-color palette in place
+
+    Args:
+        theme: Theme dictionary as returned by get_theme
+
+    Returns:
+        The same theme dictionary
+    """
+    for key, value in theme.items():
+        if isinstance(value, str):
+            theme[key] = quantize_truecolor(value)
+        elif isinstance(value, dict):
+            quantize_theme(value)
+    return theme
@@ -2,8 +2,14 @@
 Tests for color utilities
 """
 
+import io
+
+import pytest
+
+from markrender import colors
 from markrender.colors import (
-    Colors, rgb, rgb_bg, hex_to_rgb, colorize, get_terminal_width
+    Colors, rgb, rgb_bg, hex_to_rgb, colorize, color_codes, merge_sgr, get_terminal_width,
+    rgb_to_256, quantize_truecolor, supports_color
 )
 
 
@@ -102,6 +108,13 @@ class TestRgb:
         result = rgb(128, 64, 192)
         assert result == '\033[38;2;128;64;192m'
 
+    def test_rgb_float_does_not_leak_into_int(self):
+        """Test an equal float triple does not change the int result"""
+        rgb(12.0, 0, 0)
+        rgb_bg(12.0, 0, 0)
+        assert rgb(12, 0, 0) == '\033[38;2;12;0;0m'
+        assert rgb_bg(12, 0, 0) == '\033[48;2;12;0;0m'
+
 
 class TestRgbBg:
     """Test cases for rgb_bg function"""
@@ -160,6 +173,31 @@ class TestHexToRgb:
         result = hex_to_rgb('#1E90FF')
         assert result == (30, 144, 255)
 
+    def test_hex_to_rgb_invalid(self):
+        """Test invalid hex strings raise ValueError"""
+        for value in ('zzzzzz', '#12345', 'ff00 ', '12 34 '):
+            with pytest.raises(ValueError):
+                hex_to_rgb(value)
+
+
+class TestRgbTo256:
+    """Test cases for rgb_to_256 and quantize_truecolor"""
+
+    def test_pure_colors(self):
+        """Test cube corners map to their palette entries"""
+        assert rgb_to_256(0, 0, 0) == 16
+        assert rgb_to_256(255, 255, 255) == 231
+        assert rgb_to_256(255, 0, 0) == 196
+
+    def test_gray_uses_grayscale_ramp(self):
+        """Test mid gray maps to the grayscale ramp"""
+        assert rgb_to_256(128, 128, 128) == 244
+
+    def test_quantize_truecolor(self):
+        """Test 24-bit foreground and background codes are rewritten"""
+        codes = rgb(255, 0, 0) + rgb_bg(0, 0, 0) + Colors.BOLD
+        assert quantize_truecolor(codes) == '\033[38;5;196m\033[48;5;16m' + Colors.BOLD
+
 
 class TestColorize:
     """Test cases for colorize function"""
@@ -175,6 +213,66 @@ class TestColorize:
         result = colorize("hello", Colors.RED)
         assert len(result) > 0
 
+    def test_colorize_merges_stacked_codes(self):
+        """Test stacked SGR codes are emitted as one sequence"""
+        result = colorize("hi", Colors.RED + Colors.BOLD, force_color=True)
+        assert result == '\033[31;1mhi\033[0m'
+
+    def test_colorize_nested_single_reset(self):
+        """Test nested colorize does not emit a redundant trailing reset"""
+        inner = colorize("hi", Colors.ITALIC, force_color=True)
+        result = colorize(inner, Colors.BOLD, force_color=True)
+        assert result == '\033[1m\033[3mhi\033[0m'
+
+    def test_color_codes_match_colorize(self):
+        """Test color_codes wraps text the same way colorize does"""
+        for dim in (False, True):
+            start, end = color_codes(Colors.RED, force_color=True, dim_mode=dim)
+            assert start + "7" + end == colorize("7", Colors.RED, force_color=True, dim_mode=dim)
+
+
+class TestMergeSgr:
+    """Test cases for merge_sgr function"""
+
+    def test_merge_truecolor_and_bold(self):
+        """Test truecolor code merges with an attribute"""
+        assert merge_sgr(rgb(1, 2, 3) + Colors.BOLD) == '\033[38;2;1;2;3;1m'
+
+    def test_single_code_unchanged(self):
+        """Test a single code is returned as is"""
+        assert merge_sgr(Colors.BOLD) == Colors.BOLD
+
+    def test_non_sgr_unchanged(self):
+        """Test strings that are not pure SGR runs are left alone"""
+        assert merge_sgr('x' + Colors.BOLD + Colors.DIM) == 'x' + Colors.BOLD + Colors.DIM
+
+
+class TestSupportsColor:
+    """Test cases for supports_color function"""
+
+    def test_force_color_always_supported(self):
+        """Test force_color bypasses terminal detection"""
+        assert supports_color(force_color=True)
+
+    def test_detection_is_cached(self, monkeypatch):
+        """Test terminal detection runs once until the cache is cleared"""
+        class FakeTty(io.StringIO):
+            calls = 0
+
+            def isatty(self):
+                FakeTty.calls += 1
+                return True
+
+        monkeypatch.setattr(colors.sys, 'stdout', FakeTty())
+        monkeypatch.setattr(colors, '_IS_WINDOWS', False)
+        colors._stdout_supports_color.cache_clear()
+        try:
+            assert supports_color()
+            assert supports_color()
+            assert FakeTty.calls == 1
+        finally:
+            colors._stdout_supports_color.cache_clear()
+
 
 class TestGetTerminalWidth:
     """Test cases for get_terminal_width function"""
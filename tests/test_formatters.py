@@ -2,6 +2,7 @@
 Tests for formatters module
 """
 
+from markrender import colors
 from markrender.formatters import MarkdownFormatter
 from markrender.themes import get_theme, list_themes
 
@@ -60,6 +61,19 @@ class TestMarkdownFormatter:
         result = self.formatter.format_code_block(code, "", line_numbers=False)
         assert "plain text" in result
 
+    def test_format_code_block_unhighlighted_without_language(self):
+        """Test code without a known language is emitted verbatim"""
+        for language in ("", "not-a-language"):
+            result = self.formatter.format_code_block("a = 1\n", language, line_numbers=False)
+            assert result == "\na = 1\n"
+
+    def test_format_code_block_strips_blank_edge_lines_without_language(self):
+        """Test unhighlighted code drops blank edge lines like Pygments does"""
+        for language in ("", "mermaid"):
+            result = self.formatter.format_code_block("\n\nx = 1\n\n", language, line_numbers=True)
+            assert result.endswith(" 1  x = 1\n")
+            assert " 2  " not in result
+
     def test_format_code_block_line_numbers(self):
         """Test code block has line numbers when enabled"""
         code = "line1\nline2\nline3"
@@ -80,6 +94,33 @@ class TestMarkdownFormatter:
         result = self.formatter.format_code_block("", "", line_numbers=False)
         assert result is not None
 
+    def test_format_code_block_repeated_is_identical(self):
+        """Test repeated code blocks reuse the cached highlight"""
+        code = "x = 1\nprint(x)"
+        first = self.formatter.format_code_block(code, "python", line_numbers=True)
+        second = self.formatter.format_code_block(code, "python", line_numbers=True)
+        assert first == second
+
+    def test_format_code_line_unknown_language_is_raw(self):
+        """Test streamed lines of an unknown language are left unhighlighted"""
+        for _ in range(2):
+            result = self.formatter.format_code_line("graph TD", "not-a-language")
+            assert result == "graph TD"
+
+    def test_no_color_support_emits_plain_text(self, monkeypatch):
+        """Test color support is resolved once and skipped when unavailable"""
+        monkeypatch.setattr(colors, '_stdout_supports_color', lambda: False)
+        formatter = MarkdownFormatter(get_theme('github-dark'))
+        monkeypatch.setattr(colors, '_stdout_supports_color', lambda: True)
+        assert formatter.format_heading(1, "Title") == "\n# Title\n"
+        result = formatter.format_code_block("a\nb", "", line_numbers=True)
+        assert result.startswith("\n 1  ")
+
+    def test_format_line_number(self):
+        """Test streamed line numbers are right-aligned to the given width"""
+        formatter = MarkdownFormatter(get_theme('github-dark'), force_color=True)
+        assert formatter.format_line_number(7, 3) == "\033[90m  7\033[0m"
+
     def test_format_inline_code(self):
         """Test inline code formatting"""
         result = self.formatter.format_inline_code("code")
@@ -207,6 +248,15 @@ class TestMarkdownFormatter:
         result = self.formatter.format_blockquote("Quote")
         assert "\u2502" in result  # │
 
+    def test_format_blockquote_border_follows_dim_mode(self):
+        """Test cached quote borders still switch with dim mode"""
+        formatter = MarkdownFormatter(get_theme('github-dark'), force_color=True)
+        normal = formatter.format_blockquote("Quote")
+        formatter.dim_mode = True
+        assert formatter.format_blockquote("Quote") != normal
+        formatter.dim_mode = False
+        assert formatter.format_blockquote("Quote") == normal
+
     def test_format_link(self):
         """Test link formatting"""
         result = self.formatter.format_link("Link Text", "https://example.com")
@@ -233,11 +283,27 @@ class TestMarkdownFormatter:
         dash_count = clean.count('─')
         assert dash_count == 40, f'Expected 40 dashes, got {dash_count}'
 
+    def test_format_hr_cached_per_dim_mode(self):
+        """Test cached HR still follows dim mode and width changes"""
+        formatter = MarkdownFormatter(get_theme('github-dark'), width=10, force_color=True)
+        normal = formatter.format_hr()
+        formatter.dim_mode = True
+        assert formatter.format_hr() != normal
+        formatter.dim_mode = False
+        assert formatter.format_hr() == normal
+        formatter.width = 5
+        assert formatter.format_hr().count('─') == 5
+
     def test_format_emoji(self):
         """Test emoji formatting"""
         result = self.formatter.format_emoji("😊")
         assert result is not None
 
+    def test_format_emoji_unknown_code_unchanged(self):
+        """Test unknown shortcodes are returned as-is, including repeats"""
+        for _ in range(2):
+            assert self.formatter.format_emoji("not_an_emoji_code") == ":not_an_emoji_code:"
+
     def test_format_alert_note(self):
         """Test formatting NOTE alert"""
         result = self.formatter.format_alert("NOTE", "This is a note")
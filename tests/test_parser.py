@@ -234,6 +234,18 @@ class TestMarkdownParser:
         assert not self.parser.is_hr("")
         assert not self.parser.is_hr("----a")
 
+    def test_block_candidates_plain_text(self):
+        """Test plain paragraph lines have no block candidates"""
+        assert not self.parser.block_candidates("Just some text")
+        assert not self.parser.block_candidates("")
+
+    def test_block_candidates_by_first_char(self):
+        """Test block candidates are chosen by first non-blank character"""
+        assert 'heading' in self.parser.block_candidates("# Title")
+        assert 'code_fence' in self.parser.block_candidates("  ```python")
+        assert 'ordered_list' in self.parser.block_candidates("12. Item")
+        assert {'hr', 'checkbox', 'list_item'} <= self.parser.block_candidates("- [ ] Task")
+
     def test_apply_inline_formatting_image(self):
         """Test image formatting"""
         text = "![Alt text](image.png)"
@@ -12,6 +12,11 @@ from markrender.themes import list_themes
 class TestMarkdownRenderer:
     """Test cases for MarkdownRenderer"""
 
+    def test_package_export_listed(self):
+        """Test the lazily imported renderer is still listed by dir()"""
+        import markrender
+        assert 'MarkdownRenderer' in dir(markrender)
+
     def test_initialization_default(self):
         """Test renderer initialization with defaults"""
         renderer = MarkdownRenderer()
@@ -620,3 +625,65 @@ class TestMarkdownRenderer:
         result = output.getvalue()
         assert "A" in result
         assert "code" in result
+
+    def test_repeated_inline_line_is_cached(self):
+        """Test identical inline lines are formatted once and rendered identically"""
+        output = StringIO()
+        renderer = MarkdownRenderer(output=output, force_color=True)
+
+        renderer.render("Some **bold** text\n")
+        renderer.render("Some **bold** text\n")
+        renderer.finalize()
+
+        result = output.getvalue()
+        first, second = result.split('\n')[:2]
+        assert first == second
+        assert len(renderer._inline_cache) == 1
+
+    def test_inline_cache_respects_dim_mode(self):
+        """Test dim mode is part of the inline cache key"""
+        output = StringIO()
+        renderer = MarkdownRenderer(output=output, force_color=True)
+
+        renderer.render("Some **bold** text\n")
+        renderer.render("Some **bold** text\n", dim_mode=True)
+        renderer.finalize()
+
+        lines = output.getvalue().split('\n')
+        assert lines[0] != lines[1]
+
+    def test_render_flushes_once_per_chunk(self):
+        """Test a multi-line chunk is flushed once rather than per element"""
+        class CountingOutput(StringIO):
+            flushes = 0
+
+            def flush(self):
+                self.flushes += 1
+
+        output = CountingOutput()
+        renderer = MarkdownRenderer(output=output)
+        renderer.render("# Title\n\nSome text\n- item\n")
+        assert output.flushes == 1
+
+        renderer.render("partial")
+        assert output.flushes == 1
+
+    def test_truecolor_disabled_uses_256_colors(self):
+        """Test theme colors are quantized when truecolor is off"""
+        output = StringIO()
+        renderer = MarkdownRenderer(output=output, force_color=True, truecolor=False)
+        renderer.render("# Title\n")
+        renderer.finalize()
+
+        result = output.getvalue()
+        assert '38;5;' in result
+        assert '38;2;' not in result
+
+    def test_truecolor_enabled_keeps_rgb(self):
+        """Test theme colors stay 24-bit when truecolor is on"""
+        output = StringIO()
+        renderer = MarkdownRenderer(output=output, force_color=True, truecolor=True)
+        renderer.render("# Title\n")
+        renderer.finalize()
+
+        assert '38;2;' in output.getvalue()